@@ -1,45 +1,201 @@
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
+from sklearn.preprocessing import normalize
+from functools import lru_cache
+import bisect
 import os
+import re
+
+# numba is optional: when available, similarity scoring runs through a
+# parallel JIT kernel instead of scipy's sparse matmul
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# pyarrow is optional: its CSV reader parses with all cores, which cuts
+# the load_data time that delays the first request
+try:
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+# sparse_dot_topn is optional: when available, the top neighbors of every
+# book are precomputed in one parallel sparse product at load time
+try:
+    from sparse_dot_topn import sp_matmul_topn
+except ImportError:
+    sp_matmul_topn = None
+
+# Neighbors kept per book in the precomputed table; queries for more fall
+# back to on-demand scoring
+NEIGHBOR_TOPN = 50
+
+
+def _read_csv(path):
+    if pacsv is not None:
+        table = pacsv.read_csv(
+            path,
+            parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'))
+        return table.to_pandas()
+    return pd.read_csv(path, on_bad_lines='skip')
+
+if numba is not None:
+    # nogil releases the GIL for the scoring pass, so under threaded workers
+    # concurrent recommendation requests run in parallel instead of
+    # serializing on one core; cache persists the compiled kernel across
+    # process restarts, avoiding the first-request JIT pause
+    @numba.njit(parallel=True, fastmath=True, nogil=True, cache=True)
+    def _cosine_row_vs_matrix(indptr, indices, data, query):
+        # Rows are L2-normalized at load time, so the cosine similarity of
+        # row i against the query is just their dot product
+        n_rows = indptr.shape[0] - 1
+        scores = np.zeros(n_rows, dtype=data.dtype)
+        for i in numba.prange(n_rows):
+            acc = 0.0
+            for j in range(indptr[i], indptr[i + 1]):
+                acc += data[j] * query[indices[j]]
+            scores[i] = acc
+        return scores
 
 class Recommender:
     def __init__(self, data_dir='data'):
         self.data_dir = data_dir
         self.books_path = os.path.join(data_dir, 'books.csv')
         self.ratings_path = os.path.join(data_dir, 'ratings.csv')
+        # Typed columnar copies written by convert_to_parquet.py; preferred
+        # over the CSVs when present since they skip parsing and coercion
+        self.books_parquet_path = os.path.join(data_dir, 'books.parquet')
+        self.ratings_parquet_path = os.path.join(data_dir, 'ratings.parquet')
         self.books = None
         self.ratings = None
         self.tfidf_matrix = None
-        self.cosine_sim = None
+        self.neighbors = None
         self.indices = None
+        self.names_lower = None
+        self.token_rows = {}
+        self.sorted_tokens = []
+        self.id_to_idx = {}
+        self.reviews_by_name = {}
+        # The data never mutates after load_data, so per-request results of
+        # the static endpoints are memoized
+        self._top_books_cache = {}
+        self._all_books_cache = []
+        self._records = []
+        self._rating = None
+        self._counts = None
+        self._top_order = None
         
         self.load_data()
 
     def load_data(self):
-        if os.path.exists(self.books_path):
+        # Only prefer parquet when pyarrow is around to read it
+        use_books_parquet = pacsv is not None and os.path.exists(self.books_parquet_path)
+        use_ratings_parquet = pacsv is not None and os.path.exists(self.ratings_parquet_path)
+
+        if use_books_parquet or os.path.exists(self.books_path):
             try:
-                self.books = pd.read_csv(self.books_path, on_bad_lines='skip')
+                if use_books_parquet:
+                    self.books = pd.read_parquet(self.books_parquet_path)
+                else:
+                    self.books = _read_csv(self.books_path)
                 # Clean and preprocess books data
                 self.books['Name'] = self.books['Name'].fillna('')
                 self.books['Authors'] = self.books['Authors'].fillna('')
                 self.books['Publisher'] = self.books['Publisher'].fillna('')
                 self.books['Rating'] = pd.to_numeric(self.books['Rating'], errors='coerce').fillna(0)
                 
-                # Create a soup of metadata for content-based filtering
-                self.books['soup'] = self.books['Name'] + ' ' + self.books['Authors'] + ' ' + self.books['Publisher']
-                
-                # Compute TF-IDF matrix
-                tfidf = TfidfVectorizer(stop_words='english')
-                self.tfidf_matrix = tfidf.fit_transform(self.books['soup'])
-                
-                # Compute Cosine Similarity matrix (might be slow for very large datasets, but 1000 rows is fine)
-                # If dataset is huge, we compute on demand or use approximate nearest neighbors
-                if len(self.books) < 5000:
-                    self.cosine_sim = linear_kernel(self.tfidf_matrix, self.tfidf_matrix)
-                    self.indices = pd.Series(self.books.index, index=self.books['Name']).drop_duplicates()
-                
+                # Create a soup of metadata for content-based filtering. A
+                # local, not a column: it is only read once to fit the TF-IDF
+                # and would otherwise sit in the DataFrame (and every cached
+                # record dict) forever.
+                soup = self.books['Name'] + ' ' + self.books['Authors'] + ' ' + self.books['Publisher']
+
+                # Compute TF-IDF matrix and L2-normalize the rows once, so the
+                # cosine similarity of two books is just the dot product of their rows.
+                # We compute similarities on demand (one sparse row-matrix product per
+                # query) instead of materializing the dense NxN matrix, which keeps
+                # memory at O(nnz) and scales to large datasets.
+                # min_df=2 drops terms that appear in a single book - they can
+                # never contribute to a similarity ranking but typically make
+                # up most of the vocabulary on short metadata. max_features
+                # caps vocabulary growth, sublinear_tf dampens repeated terms,
+                # and dtype=float32 halves the CSR data buffer (and the derived
+                # neighbor table); scores are ranked, never displayed, so the
+                # lost precision is irrelevant.
+                tfidf = TfidfVectorizer(stop_words='english', min_df=2,
+                                        max_features=20000, sublinear_tf=True,
+                                        dtype=np.float32)
+                try:
+                    matrix = tfidf.fit_transform(soup)
+                except ValueError:
+                    # Tiny catalogs can have no repeated term at all, which
+                    # leaves min_df=2 with an empty vocabulary
+                    tfidf.set_params(min_df=1)
+                    matrix = tfidf.fit_transform(soup)
+                self.tfidf_matrix = normalize(matrix, norm='l2', copy=False).tocsr()
+                self.indices = pd.Series(self.books.index, index=self.books['Name']).drop_duplicates()
+
+                # Precompute the top neighbors of every book in one parallel
+                # sparse product, keeping memory at O(N * top_n) instead of O(N^2)
+                if sp_matmul_topn is not None:
+                    self.neighbors = sp_matmul_topn(
+                        self.tfidf_matrix, self.tfidf_matrix.T,
+                        top_n=NEIGHBOR_TOPN, sort=True, n_threads=os.cpu_count())
+
+                # Hash map for O(1) Id -> row index lookups on the request path,
+                # with keys normalized to int once instead of per lookup
+                ids = pd.to_numeric(self.books['Id'], errors='coerce')
+                self.id_to_idx = {int(i): pos for pos, i in enumerate(ids) if pd.notna(i)}
+
+                # Downcast the hot columns: the defaults (int64/object) move
+                # twice the bytes actually needed through every sort and
+                # filter. Authors/Publisher repeat heavily, so categoricals
+                # replace per-row Python strings with small integer codes.
+                # Rating stays float64: float32 values pick up representation
+                # noise (4.57 -> 4.5700001...) when rendered in templates.
+                self.books['Id'] = ids.fillna(0).astype(np.int32)
+                if 'CountsOfReview' in self.books.columns:
+                    self.books['CountsOfReview'] = pd.to_numeric(
+                        self.books['CountsOfReview'], errors='coerce').fillna(0).astype(np.int32)
+                self.books['Authors'] = self.books['Authors'].astype('category')
+                self.books['Publisher'] = self.books['Publisher'].astype('category')
+
+                # Lowercase the names once: case-insensitive search otherwise
+                # re-lowercases the whole column on every request
+                self.names_lower = self.books['Name'].str.lower()
+
+                # Inverted index over name tokens: search walks token -> rows
+                # instead of scanning every name. The sorted token list lets a
+                # query token prefix-match (e.g. 'pot' finds 'potter').
+                for pos, name in enumerate(self.names_lower):
+                    for tok in set(re.findall(r'[a-z0-9]+', name)):
+                        self.token_rows.setdefault(tok, []).append(pos)
+                self.sorted_tokens = sorted(self.token_rows)
+
+                # Pull the ranking keys out as plain NumPy arrays (SoA): the
+                # hot paths then index raw buffers with no DataFrame dispatch
+                self._rating = self.books['Rating'].to_numpy()
+                if 'CountsOfReview' in self.books.columns:
+                    self._counts = self.books['CountsOfReview'].to_numpy()
+                else:
+                    self._counts = np.zeros(len(self.books), dtype=np.int32)
+
+                # The rating order never changes, so sort once here; serving
+                # top-n is then just a slice of this permutation. lexsort keys
+                # run last-to-first, negated for descending order.
+                self._top_order = np.lexsort((-self._counts, -self._rating))
+
+                # Materialize the row dicts once: to_dict('records') allocates
+                # one dict per row and re-boxes every cell, so doing it per
+                # request dominated response building
+                self._records = self.books.to_dict('records')
+
+                # Warm the caches for the static endpoints
+                self._top_books_cache[12] = self._compute_top_books(12)
+                self._all_books_cache = self.books[['Id', 'Name', 'Authors', 'Rating']].to_dict('records')
+
             except Exception as e:
                 print(f"Error loading books.csv: {e}")
                 self.books = pd.DataFrame()
@@ -47,18 +203,26 @@ class Recommender:
             print("books.csv not found.")
             self.books = pd.DataFrame()
 
-        if os.path.exists(self.ratings_path):
+        if use_ratings_parquet or os.path.exists(self.ratings_path):
             try:
-                self.ratings = pd.read_csv(self.ratings_path, on_bad_lines='skip')
-                # Map text ratings to numbers
-                rating_map = {
-                    'it was amazing': 5,
-                    'really liked it': 4,
-                    'liked it': 3,
-                    'it was ok': 2,
-                    'did not like it': 1
-                }
-                self.ratings['RatingNum'] = self.ratings['Rating'].map(rating_map)
+                if use_ratings_parquet:
+                    self.ratings = pd.read_parquet(self.ratings_parquet_path)
+                else:
+                    self.ratings = _read_csv(self.ratings_path)
+                # Map text ratings to numbers via ordered categorical codes:
+                # a single C-level pass instead of a Python dict lookup per row.
+                # Codes run 0-4 in category order, so code + 1 is the star
+                # rating; unrecognized texts code to -1 and become NaN as with
+                # the old dict map.
+                rating_levels = ['did not like it', 'it was ok', 'liked it',
+                                 'really liked it', 'it was amazing']
+                codes = pd.Categorical(self.ratings['Rating'],
+                                       categories=rating_levels, ordered=True).codes
+                self.ratings['RatingNum'] = np.where(codes >= 0, codes + 1, np.nan)
+
+                # Group reviews by book name once so get_reviews is a dict
+                # lookup instead of a full-column scan per request
+                self.reviews_by_name = self.ratings.groupby('Name')['Rating'].apply(list).to_dict()
             except Exception as e:
                 print(f"Error loading ratings.csv: {e}")
                 self.ratings = pd.DataFrame()
@@ -66,29 +230,79 @@ class Recommender:
             print("ratings.csv not found.")
             self.ratings = pd.DataFrame()
 
+    def _top_similar_indices(self, idx, n):
+        # Fast path: slice the precomputed neighbor table, whose rows are
+        # already sorted by similarity
+        if self.neighbors is not None and n < NEIGHBOR_TOPN:
+            row = self.neighbors[idx]
+            return [i for i in row.indices if i != idx][:n]
+
+        # Compute similarity scores on demand: one sparse row-matrix product,
+        # through the parallel numba kernel when available
+        if numba is not None:
+            query = self.tfidf_matrix[idx].toarray().ravel()
+            scores = _cosine_row_vs_matrix(self.tfidf_matrix.indptr,
+                                           self.tfidf_matrix.indices,
+                                           self.tfidf_matrix.data, query)
+        else:
+            scores = (self.tfidf_matrix @ self.tfidf_matrix[idx].T).toarray().ravel()
+
+        # Partial sort: only the top n+1 candidates need ordering, not all N
+        if scores.size <= n + 1:
+            top = np.argsort(-scores)
+        else:
+            top = np.argpartition(-scores, n + 1)[:n + 1]
+            top = top[np.argsort(-scores[top])]
+
+        # Drop the book itself and keep the n most similar
+        return [i for i in top if i != idx][:n]
+
+    def _compute_top_books(self, n):
+        # Sort by Rating then CountsOfReview to get popular high-rated books.
+        # Weighted rating could be better, but simple sort is fine for now;
+        # the permutation is precomputed in load_data, so this is a slice.
+        return [self._records[i] for i in self._top_order[:n]]
+
     def get_top_books(self, n=12):
         if self.books.empty:
             return []
-        # Sort by Rating and CountsOfReview (if available) to get popular high-rated books
-        # Assuming CountsOfReview is numeric
-        if 'CountsOfReview' in self.books.columns:
-            self.books['CountsOfReview'] = pd.to_numeric(self.books['CountsOfReview'], errors='coerce').fillna(0)
-            # Weighted rating could be better, but simple sort is fine for now
-            top_books = self.books.sort_values(by=['Rating', 'CountsOfReview'], ascending=False).head(n)
-        else:
-            top_books = self.books.sort_values(by='Rating', ascending=False).head(n)
-        
-        return top_books.to_dict('records')
+        if n not in self._top_books_cache:
+            self._top_books_cache[n] = self._compute_top_books(n)
+        return self._top_books_cache[n]
+
+    def _rows_with_token_prefix(self, tok):
+        # Collect rows for every indexed token starting with tok
+        rows = set()
+        i = bisect.bisect_left(self.sorted_tokens, tok)
+        while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(tok):
+            rows.update(self.token_rows[self.sorted_tokens[i]])
+            i += 1
+        return rows
 
     def search_books(self, query):
         if self.books.empty:
             return []
-        # Simple case-insensitive search
-        results = self.books[self.books['Name'].str.contains(query, case=False, na=False)]
-        return results.head(20).to_dict('records')
+
+        q = query.lower()
+
+        # Sub-linear path: intersect the inverted-index rows of each query
+        # token (prefix-matched), independent of the number of books
+        rows = None
+        for tok in re.findall(r'[a-z0-9]+', q):
+            matched = self._rows_with_token_prefix(tok)
+            rows = matched if rows is None else rows & matched
+            if not rows:
+                break
+        if rows:
+            return [self._records[i] for i in sorted(rows)[:20]]
+
+        # Fall back to a substring scan for queries the token index cannot
+        # serve, e.g. mid-word fragments like 'obbit'
+        mask = self.names_lower.str.contains(q, regex=False, na=False)
+        return [self._records[i] for i in np.flatnonzero(mask.to_numpy())[:20]]
 
     def get_recommendations(self, title, n=6):
-        if self.books.empty or self.cosine_sim is None:
+        if self.books.empty or self.tfidf_matrix is None:
             return []
         
         try:
@@ -96,7 +310,7 @@ class Recommender:
             # Handle potential multiple matches or exact match issues
             if title not in self.indices:
                 # Try partial match
-                matches = self.books[self.books['Name'].str.contains(title, case=False, regex=False)]
+                matches = self.books[self.names_lower.str.contains(title.lower(), regex=False, na=False)]
                 if not matches.empty:
                     title = matches.iloc[0]['Name']
                 else:
@@ -108,65 +322,27 @@ class Recommender:
             if isinstance(idx, pd.Series):
                 idx = idx.iloc[0]
 
-            # Get the pairwsie similarity scores of all books with that book
-            sim_scores = list(enumerate(self.cosine_sim[idx]))
-
-            # Sort the books based on the similarity scores
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-
-            # Get the scores of the n most similar books
-            sim_scores = sim_scores[1:n+1]
-
-            # Get the book indices
-            book_indices = [i[0] for i in sim_scores]
-
             # Return the top most similar books
-            return self.books.iloc[book_indices].to_dict('records')
+            return [self._records[i] for i in self._top_similar_indices(idx, n)]
         except Exception as e:
             print(f"Error getting recommendations: {e}")
             return []
 
+    @lru_cache(maxsize=1024)
     def get_recommendations_by_id(self, book_id, n=6):
-        if self.books.empty or self.cosine_sim is None:
+        if self.books.empty or self.tfidf_matrix is None:
             return []
         
         try:
-            # Find the index of the book with the given Id
-            # Check if Id column exists
-            if 'Id' not in self.books.columns:
+            # O(1) lookup of the row index for the given Id. The routes
+            # normalize book_id to int (/book/<int:book_id> and the int()
+            # conversion in /recommend_by_id), so no string fallback here.
+            idx = self.id_to_idx.get(book_id)
+            if idx is None:
                 return []
 
-            # Filter to find the row
-            # We need the dataframe index (0 to len-1), not the 'Id' column value
-            book_idx_series = self.books.index[self.books['Id'] == book_id]
-            
-            if book_idx_series.empty:
-                # Try converting to int if it was passed as string
-                try:
-                    book_id_int = int(book_id)
-                    book_idx_series = self.books.index[self.books['Id'] == book_id_int]
-                except:
-                    pass
-            
-            if book_idx_series.empty:
-                return []
-
-            idx = book_idx_series[0]
-
-            # Get the pairwsie similarity scores of all books with that book
-            sim_scores = list(enumerate(self.cosine_sim[idx]))
-
-            # Sort the books based on the similarity scores
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-
-            # Get the scores of the n most similar books
-            sim_scores = sim_scores[1:n+1]
-
-            # Get the book indices
-            book_indices = [i[0] for i in sim_scores]
-
             # Return the top most similar books
-            return self.books.iloc[book_indices].to_dict('records')
+            return [self._records[i] for i in self._top_similar_indices(idx, n)]
         except Exception as e:
             print(f"Error getting recommendations by ID: {e}")
             return []
@@ -174,24 +350,15 @@ class Recommender:
     def get_book_details(self, book_id):
         if self.books.empty:
             return None
-        book = self.books[self.books['Id'] == book_id]
-        if not book.empty:
-            return book.iloc[0].to_dict()
+        idx = self.id_to_idx.get(book_id)
+        if idx is not None:
+            return self._records[idx]
         return None
 
     def get_all_books(self):
-        if self.books.empty:
-            return []
-        # Return relevant columns
-        return self.books[['Id', 'Name', 'Authors', 'Rating']].to_dict('records')
+        # Relevant columns only, precomputed at load time
+        return self._all_books_cache
 
     def get_reviews(self, book_name, limit=3):
-        if self.ratings.empty:
-            return []
-        # Filter ratings by book name
         # Assuming 'Name' in ratings.csv corresponds to 'Name' in books.csv
-        book_reviews = self.ratings[self.ratings['Name'] == book_name]
-        if book_reviews.empty:
-            return []
-        # Return the text ratings, limited to 'limit' entries
-        return book_reviews['Rating'].head(limit).tolist()
+        return self.reviews_by_name.get(book_name, [])[:limit]